@@ -1,6 +1,7 @@
+import functools
 import pkgutil
 import importlib
-import inspect
+import sys
 import time
 from typing import Dict, Any, List
 from pathlib import Path
@@ -12,9 +13,17 @@ logger = get_logger("main")
 TESTS_PACKAGE = "tests"
 
 
+@functools.lru_cache(maxsize=None)
 def discover_tests() -> List[BaseTest]:
+    """Descobre os testes uma única vez; chamadas seguintes reaproveitam o resultado."""
+    return _discover_tests_uncached()
+
+
+def _discover_tests_uncached() -> List[BaseTest]:
     """Descobre e importa automaticamente os módulos em src/tests/"""
     tests = []
+    # nomes já registrados: evita testes duplicados (ex: classe importada em outro módulo)
+    seen_names = set()
     package = importlib.import_module(f"{TESTS_PACKAGE}")
     package_path = Path(package.__file__).parent
 
@@ -23,7 +32,7 @@ def discover_tests() -> List[BaseTest]:
             continue
         full_name = f"{TESTS_PACKAGE}.{name}"
         try:
-            mod = importlib.import_module(full_name)
+            mod = sys.modules.get(full_name) or importlib.import_module(full_name)
         except Exception as e:
             logger.error(f"Falha ao importar {full_name}: {e}")
             continue
@@ -31,16 +40,25 @@ def discover_tests() -> List[BaseTest]:
         if hasattr(mod, "test"):
             candidate = getattr(mod, "test")
             if isinstance(candidate, BaseTest):
-                tests.append(candidate)
+                if candidate.name in seen_names:
+                    logger.warning(f"Teste duplicado ignorado: {candidate.name} ({full_name})")
+                else:
+                    seen_names.add(candidate.name)
+                    tests.append(candidate)
                 continue
 
-        for _, obj in inspect.getmembers(mod, inspect.isclass):
-            if issubclass(obj, BaseTest) and obj is not BaseTest:
+        for obj in list(vars(mod).values()):
+            if isinstance(obj, type) and issubclass(obj, BaseTest) and obj is not BaseTest:
                 try:
                     inst = obj()
-                    tests.append(inst)
                 except Exception as e:
                     logger.error(f"Falha instanciando {obj}: {e}")
+                    continue
+                if inst.name in seen_names:
+                    logger.warning(f"Teste duplicado ignorado: {inst.name} ({full_name})")
+                    continue
+                seen_names.add(inst.name)
+                tests.append(inst)
     return tests
 
 
@@ -53,8 +71,8 @@ def prompt_inputs(requires: Dict[str, str]) -> Dict[str, Any]:
 
 
 def pretty_print_result(res: Dict[str, Any]):
-    from rich import print_json
     try:
+        from rich import print_json
         print_json(data=res)
     except Exception:
         print(res)
@@ -104,7 +122,7 @@ def main():
         logger.info(f"Inputs recebidos: {inputs}")
 
         try:
-            start_time = time.time()
+            start_time = time.perf_counter()
             result = selected.run(inputs)
             enriched = enrich_result(selected.name, result, start_time)
             pretty_print_result(enriched)
@@ -0,0 +1,26 @@
+# src/tests/_http.py
+# Utilitários HTTP compartilhados pelos testes (o prefixo "_" evita que o loader o trate como teste).
+from typing import Iterator, Tuple
+
+METHODS = frozenset(("GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH"))
+
+
+def iter_header_lines(raw: str) -> Iterator[Tuple[str, str]]:
+    """
+    Percorre um bloco de headers colado (ex: copiado do Burp) e gera pares (key, value).
+    - Ignora request-line se presente (ex: 'GET /path HTTP/1.1').
+    - Linhas sem ':' são ignoradas.
+    """
+    for line in raw.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        # request-line: começa com método conhecido e o último token contém 'HTTP/'
+        # (checada antes do ':' porque a URL pode conter ':', ex: 'GET http://host:8080/ HTTP/1.1')
+        method, sp, rest = line.partition(" ")
+        if sp and method.upper() in METHODS and "HTTP/" in rest.rpartition(" ")[2].upper():
+            continue
+        key, sep, value = line.partition(":")
+        if not sep:
+            continue
+        yield key.strip(), value.lstrip()
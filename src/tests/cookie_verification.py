@@ -3,8 +3,20 @@ from typing import Dict, Any, List, Optional
 import re
 import sys
 import requests
+from requests.adapters import HTTPAdapter
 import time
+from http.cookies import SimpleCookie, CookieError
 from .base import BaseTest
+from ._http import iter_header_lines
+
+# Session compartilhada pelo módulo: mantém conexões keep-alive entre execuções do teste
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=64, pool_maxsize=256, max_retries=0))
+_SESSION.mount("http://", HTTPAdapter(pool_connections=64, pool_maxsize=256, max_retries=0))
+
+# split em ", " somente quando o token seguinte parece ser um cookie-name (alnum or _ or -) seguido de '='
+# isso evita quebrar datas em Expires (ex: "Wed, 21 Oct 2020 07:28:00 GMT")
+_SET_COOKIE_SPLIT_RE = re.compile(r", (?=[A-Za-z0-9_\-]+\=)")
 
 def _read_multiline(prompt: str) -> str:
     print(prompt)
@@ -36,11 +48,8 @@ def _split_set_cookie_block(raw: str) -> List[str]:
         if len(parts) > 1:
             return parts
 
-    # heurística para split: split em ", " somente quando o token seguinte
-    # parece ser um cookie-name (alnum or _ or -) seguido de '='
-    # isso evita quebrar datas em Expires (ex: "Wed, 21 Oct 2020 07:28:00 GMT")
-    pattern = re.compile(r", (?=[A-Za-z0-9_\-]+\=)")
-    parts = pattern.split(raw)
+    # heurística para split (ver _SET_COOKIE_SPLIT_RE)
+    parts = _SET_COOKIE_SPLIT_RE.split(raw)
     # strip e filtrar vazios
     return [p.strip() for p in parts if p.strip()]
 
@@ -48,6 +57,40 @@ def _parse_set_cookie(header_value: str) -> Dict[str, Any]:
     """
     Recebe uma única string de Set-Cookie (ex: 'NAME=val; Path=/; Secure; HttpOnly; SameSite=Lax')
     e retorna um dict com name, value, atributos e flags booleans.
+    Usa http.cookies.SimpleCookie; se ele não reconhecer exatamente um cookie, cai no parser manual.
+    """
+    jar = SimpleCookie()
+    try:
+        jar.load(header_value)
+    except CookieError:
+        return _parse_set_cookie_manual(header_value)
+
+    # SimpleCookie descarta o header inteiro diante de atributos que não conhece (ex: Partitioned)
+    # e trata outros (ex: Priority=High) como um segundo cookie
+    if len(jar) != 1:
+        return _parse_set_cookie_manual(header_value)
+
+    morsel = next(iter(jar.values()))
+    attrs = {k: v for k, v in morsel.items() if v and k not in ("secure", "httponly")}
+
+    return {
+        "raw": header_value,
+        "name": morsel.key,
+        "value": morsel.coded_value,
+        "domain": attrs.get("domain"),
+        "path": attrs.get("path"),
+        "expires": attrs.get("expires"),
+        "flags": {
+            "secure": bool(morsel["secure"]),
+            "httponly": bool(morsel["httponly"]),
+            "samesite": morsel["samesite"] or None,
+        },
+        "attrs": attrs,
+    }
+
+def _parse_set_cookie_manual(header_value: str) -> Dict[str, Any]:
+    """
+    Parser manual de Set-Cookie, usado quando o SimpleCookie não consegue interpretar o header.
     """
     parts = [p.strip() for p in header_value.split(";")]
     if not parts:
@@ -131,18 +174,8 @@ class CookieVerificationTest(BaseTest):
         headers = {}
         if not raw:
             return headers
-        for line in raw.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            # ignorar request-line se colada
-            parts0 = line.split()
-            if len(parts0) >= 3 and parts0[0].upper() in ("GET","POST","PUT","DELETE","HEAD","OPTIONS","PATCH") and "HTTP/" in parts0[-1].upper():
-                continue
-            if ":" not in line:
-                continue
-            k, v = line.split(":", 1)
-            headers[k.strip()] = v.lstrip()
+        for k, v in iter_header_lines(raw):
+            headers[k] = v
         return headers
 
     def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
@@ -172,48 +205,23 @@ class CookieVerificationTest(BaseTest):
             "warnings": []
         }
 
-        start = time.time()
+        start = time.perf_counter()
         try:
-            sess = requests.Session()
-            # enviar requisição
-            if method == "GET":
-                r = sess.get(target, headers=headers, timeout=timeout, allow_redirects=True)
-            elif method == "POST":
-                r = sess.post(target, headers=headers, timeout=timeout, allow_redirects=True)
-            else:
-                r = sess.request(method, target, headers=headers, timeout=timeout, allow_redirects=True)
+            # enviar requisição sem cookies herdados de execuções anteriores
+            _SESSION.cookies.clear()
+            r = _SESSION.request(method, target, headers=headers, timeout=timeout, allow_redirects=True)
         except Exception as e:
             result["error"] = f"Request failed: {e}"
-            result["duration_seconds"] = round(time.time() - start, 4)
+            result["duration_seconds"] = round(time.perf_counter() - start, 4)
             return result
 
-        # extrair Set-Cookie(s)
-        sc_list: List[str] = []
-
-        # 1) tentar obter vários Set-Cookie via r.raw.headers.get_all (mais robusto)
-        try:
-            raw_headers_container = getattr(r, "raw", None)
-            if raw_headers_container is not None:
-                raw_h = getattr(raw_headers_container, "headers", None)
-                if raw_h is not None and hasattr(raw_h, "get_all"):
-                    got = raw_h.get_all("Set-Cookie")
-                    if got:
-                        sc_list = got
-        except Exception:
-            pass
-
-        # 2) fallback: requests' r.headers.get("Set-Cookie") (pode ser uma string concatenada)
-        if not sc_list:
-            sc_hdr = r.headers.get("Set-Cookie")
-            if sc_hdr:
-                # aplicar heurística para separar possiveis múltiplos cookies
-                sc_list = _split_set_cookie_block(sc_hdr)
-
-        # 3) ainda fallback: procurar todas as keys do r.headers que correspondem a Set-Cookie
-        if not sc_list:
-            for k, v in r.headers.items():
-                if k.lower() == "set-cookie":
-                    sc_list.append(v)
+        # extrair Set-Cookie(s): o HTTPHeaderDict do urllib3 (r.raw.headers) mantém cada header separado
+        raw_h = getattr(r.raw, "headers", None)
+        if raw_h is not None and hasattr(raw_h, "getlist"):
+            sc_list: List[str] = list(raw_h.getlist("Set-Cookie"))
+        else:
+            # fallback: requests' r.headers.get("Set-Cookie") (pode ser uma string concatenada)
+            sc_list = _split_set_cookie_block(r.headers.get("Set-Cookie", ""))
 
         result["raw_set_cookie_headers"] = sc_list
 
@@ -246,7 +254,7 @@ class CookieVerificationTest(BaseTest):
         result["cookies"] = parsed
         result["warnings"] = warnings
         result["status_code"] = r.status_code
-        result["duration_seconds"] = round(time.time() - start, 4)
+        result["duration_seconds"] = round(time.perf_counter() - start, 4)
         return result
 
 # instância esperada pelo loader
@@ -1,14 +1,114 @@
 # src/tests/intruder.py
 from typing import Dict, Any, List
+from array import array
+from collections import Counter
+from itertools import compress
+import asyncio
+import math
 import time
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
-import statistics
+import httpx
 import sys
 from .base import BaseTest
+from ._http import iter_header_lines
+
+try:
+    # uvloop é opcional: se disponível, é usado como event loop (mais rápido); ver _run_async
+    import uvloop
+except ImportError:
+    uvloop = None
+
+try:
+    # HTTP/2 no httpx depende do pacote opcional 'h2' (httpx[http2])
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+try:
+    # numpy é opcional: acelera o cálculo de estatísticas em execuções grandes
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _run_async(coro):
+    """
+    Executa a coroutine num event loop novo, usando uvloop quando instalado.
+    Não altera a policy global do asyncio (ao contrário de uvloop.install()).
+    """
+    if uvloop is None:
+        return asyncio.run(coro)
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+    loop = uvloop.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+# quantos resultados individuais (primeiros índices) vão para o details_sample
+_SAMPLE_SIZE = 100
+
+
+def _new_columns(total: int) -> Dict[str, Any]:
+    """
+    Armazenamento colunar (SoA) dos resultados: um array contíguo por campo em vez de um dict
+    por requisição. Só os primeiros _SAMPLE_SIZE resultados guardam o dict completo (details).
+    """
+    return {
+        "elapsed": array("d", [0.0]) * total,
+        "status": array("H", [0]) * total,
+        "ok": bytearray(total),
+        "done": bytearray(total),  # 0 = cancelada antes de terminar (ver orçamento em _drive)
+        "details": {},
+    }
+
+
+def _percentile_indexes(n: int) -> List[int]:
+    """Índices (na amostra ordenada) de p50/p95/p99 — mesma definição com ou sem numpy."""
+    return [n // 2, min(n - 1, int(n * 0.95)), min(n - 1, int(n * 0.99))]
+
+
+def _summary_stats(cols: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calcula média e percentis (p50/p95/p99) das latências, arredondados a 4 casas,
+    e a contagem por status code (apenas requisições bem-sucedidas).
+    """
+    elapsed, status, ok, done = cols["elapsed"], cols["status"], cols["ok"], cols["done"]
+    n = done.count(1)
+    if not n:
+        return {"avg": None, "p50": None, "p95": None, "p99": None, "status_counts": {}}
+
+    # requisições canceladas não têm latência: ficam de fora
+    if n < len(elapsed):
+        elapsed = array("d", compress(elapsed, done))
+
+    if np is not None:
+        # views diretas sobre os buffers das colunas, sem cópia nem loop em Python
+        lat = np.frombuffer(elapsed, dtype=np.float64)
+        codes = np.frombuffer(status, dtype=np.uint16)[np.frombuffer(ok, dtype=np.bool_)]
+        idx = _percentile_indexes(n)
+        p50, p95, p99 = np.partition(lat, idx)[idx]
+        avg = lat.mean()
+        hist = np.bincount(codes)
+        status_counts = {str(c): int(hist[c]) for c in np.flatnonzero(hist)}
+    else:
+        # um único sort serve para todos os percentis; média por soma simples
+        lat_sorted = sorted(elapsed)
+        avg = sum(elapsed) / n
+        p50, p95, p99 = (lat_sorted[i] for i in _percentile_indexes(n))
+        status_counts = dict(Counter(str(c) for c in compress(status, ok)))
+
+    return {
+        "avg": round(float(avg), 4),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "status_counts": status_counts,
+    }
 
-_LOCK = threading.Lock()
 
 class IntruderTest(BaseTest):
     @property
@@ -26,7 +126,7 @@ class IntruderTest(BaseTest):
             "target": "URL alvo (ex: https://example.com/path): ",
             "method": "Método HTTP (GET or POST) [GET]: ",
             "total": "Número total de requisições (ex: 100): ",
-            "concurrency": "Número de requisições simultâneas (threads) (ex: 10): ",
+            "concurrency": "Número de requisições simultâneas (ex: 10): ",
             "timeout": "Timeout por requisição em segundos (ex: 10) [5]: ",
         }
 
@@ -66,22 +166,7 @@ class IntruderTest(BaseTest):
         if not raw:
             return headers
 
-        for line in raw.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            # Ignora request-line (começa com método e termina com HTTP/x ou tem 'HTTP/')
-            parts0 = line.split()
-            if len(parts0) >= 3 and parts0[0].upper() in ("GET", "POST", "PUT", "DELETE", "HEAD", "OPTIONS", "PATCH") and "HTTP/" in parts0[-1].upper():
-                # é uma request-line, pular
-                continue
-            # normal header parsing: key: value
-            if ":" not in line:
-                # ignora linhas sem ':'
-                continue
-            key, value = line.split(":", 1)
-            key = key.strip()
-            value = value.lstrip()
+        for key, value in iter_header_lines(raw):
             # Se header já existir, juntamos valores com ', ' (exceto Cookie — mantemos exatamente)
             if key in headers:
                 if key.lower() == "cookie":
@@ -93,39 +178,67 @@ class IntruderTest(BaseTest):
                 headers[key] = value
         return headers
 
-    def _worker_request(self, url: str, method: str, headers: Dict[str, str], timeout: float, index: int) -> Dict[str, Any]:
+    async def _one(self, client: httpx.AsyncClient, sem: asyncio.Semaphore, url: str, method: str,
+                   headers: Dict[str, str], index: int, cols: Dict[str, Any]) -> None:
         """
-        Função executada por cada thread. Cria sua própria Session para evitar efeitos colaterais.
-        Retorna um dicionário com o resultado da tentativa.
+        Coroutine executada para cada requisição. Todas compartilham o mesmo AsyncClient
+        (e portanto as mesmas conexões: streams multiplexados em HTTP/2, keep-alive em HTTP/1.1);
+        o semáforo limita a concorrência.
+        Grava o resultado da tentativa na posição `index` das colunas (ver _new_columns).
         """
-        session = requests.Session()
-        start = time.time()
-        try:
-            if method == "GET":
-                r = session.get(url, headers=headers, timeout=timeout, allow_redirects=True)
-            elif method == "POST":
+        async with sem:
+            start = time.perf_counter()
+            try:
                 # Sem payload por padrão — futuro: adicionar payload/body/ form
-                r = session.post(url, headers=headers, timeout=timeout, allow_redirects=True)
-            else:
-                # fallback: usar request genérico
-                r = session.request(method, url, headers=headers, timeout=timeout, allow_redirects=True)
-
-            elapsed = time.time() - start
-            return {
-                "index": index,
-                "ok": True,
-                "status_code": r.status_code,
-                "reason": r.reason,
-                "elapsed_seconds": round(elapsed, 4),
-            }
-        except Exception as e:
-            elapsed = time.time() - start
-            return {
-                "index": index,
-                "ok": False,
-                "error": str(e),
-                "elapsed_seconds": round(elapsed, 4),
-            }
+                r = await client.request(method, url, headers=headers)
+                elapsed = time.perf_counter() - start
+                cols["elapsed"][index] = elapsed
+                cols["status"][index] = r.status_code
+                cols["ok"][index] = 1
+                cols["done"][index] = 1
+                if index < _SAMPLE_SIZE:
+                    cols["details"][index] = {
+                        "index": index,
+                        "ok": True,
+                        "status_code": r.status_code,
+                        "reason": r.reason_phrase,
+                        "http_version": r.http_version,
+                        "elapsed_seconds": round(elapsed, 4),
+                    }
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                cols["elapsed"][index] = elapsed
+                cols["done"][index] = 1
+                if index < _SAMPLE_SIZE:
+                    cols["details"][index] = {
+                        "index": index,
+                        "ok": False,
+                        "error": str(e) or type(e).__name__,
+                        "elapsed_seconds": round(elapsed, 4),
+                    }
+
+    async def _drive(self, url: str, method: str, headers: Dict[str, str], timeout: float,
+                     total: int, concurrency: int, cols: Dict[str, Any]) -> None:
+        """
+        Dispara as `total` requisições num único event loop, gravando os resultados em `cols`.
+        O timeout é por requisição; para limitar o tempo total há também um orçamento global,
+        após o qual as requisições ainda pendentes são canceladas.
+        """
+        sem = asyncio.Semaphore(concurrency)
+        # cada "onda" de `concurrency` requisições pode levar até `timeout`, com 50% de folga
+        budget = timeout * math.ceil(total / concurrency) * 1.5
+        # Com HTTP/2 o httpx multiplexa os streams em poucas conexões; se o servidor não negociar h2
+        # via ALPN, cai para HTTP/1.1 e aí precisa de até `concurrency` conexões.
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(http2=_HTTP2, limits=limits, timeout=timeout,
+                                     follow_redirects=True) as client:
+            tasks = [asyncio.ensure_future(self._one(client, sem, url, method, headers, i, cols))
+                     for i in range(total)]
+            _, pending = await asyncio.wait(tasks, timeout=budget)
+            for t in pending:
+                t.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
 
     def run(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
         # --- ler e normalizar inputs ---
@@ -157,54 +270,26 @@ class IntruderTest(BaseTest):
         raw_headers = self._read_multiline_headers()
         headers = self._parse_headers(raw_headers)
 
-        # summary containers
-        results: List[Dict[str, Any]] = []
-        status_counter: Dict[str, int] = {}
-        errors = 0
-        latencies: List[float] = []
-
-        start_time = time.time()
-
-        # Use ThreadPoolExecutor
-        max_workers = min(concurrency, total)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {}
-            for i in range(total):
-                fut = executor.submit(self._worker_request, target, method, headers, timeout, i)
-                futures[fut] = i
-
-            for fut in as_completed(futures):
-                res = fut.result()
-                # thread-safe append
-                with _LOCK:
-                    results.append(res)
-                    if res.get("ok"):
-                        code = res.get("status_code")
-                        code_key = str(code)
-                        status_counter[code_key] = status_counter.get(code_key, 0) + 1
-                    else:
-                        errors += 1
-                    if "elapsed_seconds" in res:
-                        try:
-                            latencies.append(float(res["elapsed_seconds"]))
-                        except Exception:
-                            pass
-
-        total_time = time.time() - start_time
-
-        # stats
-        successes = sum(1 for r in results if r.get("ok"))
-        failures = sum(1 for r in results if not r.get("ok"))
-        avg_latency = round(statistics.mean(latencies), 4) if latencies else None
-        p50 = round(statistics.median(latencies), 4) if latencies else None
-        p95 = None
-        if latencies:
-            try:
-                lat_sorted = sorted(latencies)
-                idx95 = min(len(lat_sorted)-1, int(len(lat_sorted)*0.95))
-                p95 = round(lat_sorted[idx95], 4)
-            except Exception:
-                p95 = None
+        start_time = time.perf_counter()
+
+        # asyncio: um único event loop, uma sessão e um pool de conexões para todas as requisições
+        cols = _new_columns(total)
+        _run_async(self._drive(target, method, headers, timeout, total, min(concurrency, total), cols))
+
+        total_time = time.perf_counter() - start_time
+
+        # stats: agregação única após o gather, direto sobre as colunas
+        # requests_sent (concluídas) = successes + failures; canceladas (pelo orçamento global) ficam à parte
+        completed = cols["done"].count(1)
+        cancelled = total - completed
+        successes = cols["ok"].count(1)
+        failures = completed - successes
+        errors = failures
+        if cancelled:
+            for i in range(min(total, _SAMPLE_SIZE)):
+                if not cols["done"][i]:
+                    cols["details"][i] = {"index": i, "ok": False, "error": "cancelled"}
+        stats = _summary_stats(cols)
 
         # prepare summary (não retorna detalhes demais por padrão)
         summary = {
@@ -214,16 +299,18 @@ class IntruderTest(BaseTest):
             "concurrency": concurrency,
             "timeout_seconds": timeout,
             "wall_time_seconds": round(total_time, 4),
-            "requests_sent": len(results),
+            "requests_sent": completed,
+            "cancelled": cancelled,
             "successes": successes,
             "failures": failures,
             "errors": errors,
-            "status_counts": status_counter,
-            "avg_latency_seconds": avg_latency,
-            "p50_latency_seconds": p50,
-            "p95_latency_seconds": p95,
+            "status_counts": stats["status_counts"],
+            "avg_latency_seconds": stats["avg"],
+            "p50_latency_seconds": stats["p50"],
+            "p95_latency_seconds": stats["p95"],
+            "p99_latency_seconds": stats["p99"],
             # detalhes limitados (primeiros 100) para inspeção
-            "details_sample": results[:100],
+            "details_sample": [cols["details"][i] for i in sorted(cols["details"])],
         }
 
         return summary
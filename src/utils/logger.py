@@ -1,11 +1,39 @@
 import logging
-from rich.logging import RichHandler
+import sys
 
-def get_logger(name: str = "security_toolbox"):
+_configured = False
+
+
+def _make_handler() -> logging.Handler:
+    """
+    RichHandler só em terminal interativo (e se o rich estiver instalado);
+    caso contrário um StreamHandler simples, evitando importar o rich à toa.
+    """
+    if sys.stderr.isatty():
+        try:
+            from rich.logging import RichHandler
+            return RichHandler(rich_tracebacks=True)
+        except ImportError:
+            pass
+    return logging.StreamHandler()
+
+
+def _init():
+    """Configura o logging raiz uma única vez (chamado na importação do módulo)."""
+    global _configured
+    if _configured:
+        return
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s — %(levelname)s — %(name)s — %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[RichHandler(rich_tracebacks=True)]
+        handlers=[_make_handler()]
     )
+    _configured = True
+
+
+_init()
+
+
+def get_logger(name: str = "security_toolbox"):
     return logging.getLogger(name)
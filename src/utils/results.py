@@ -3,66 +3,127 @@ import json
 import time
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterable
+
+try:
+    # orjson é opcional: encoder em C, bem mais rápido para resultados grandes
+    import orjson
+except ImportError:
+    orjson = None
 
 RESULTS_DIR = Path(__file__).resolve().parents[1] / "results"
 
 
+_RESULTS_DIR_READY = False
+
+
 def _ensure_results_dir():
-    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    """Cria o diretório de resultados na primeira chamada; as seguintes não fazem syscall."""
+    global _RESULTS_DIR_READY
+    if not _RESULTS_DIR_READY:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        _RESULTS_DIR_READY = True
     return RESULTS_DIR
 
 
+def _timestamp() -> str:
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serializa em JSON (UTF-8), usando orjson quando disponível e json como fallback."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            # ex: inteiros maiores que 64 bits — deixa o json da stdlib tratar
+            pass
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str).encode("utf-8")
+
+
+# conversão direta por tipo exato para os primitivos (caso comum nas células do CSV)
+_NORMALIZERS = {
+    str: lambda v: v,
+    int: str,
+    float: str,
+    bool: str,
+    type(None): lambda _: "",
+}
+
+
 def _normalize_value(v: Any) -> str:
     """Converte qualquer valor em string apropriada para CSV."""
-    if v is None:
-        return ""
+    fn = _NORMALIZERS.get(type(v))
+    if fn is not None:
+        return fn(v)
+    # subclasses de primitivos (ex: IntEnum) mantêm o comportamento anterior
     if isinstance(v, (str, int, float, bool)):
         return str(v)
     try:
-        return json.dumps(v, ensure_ascii=False, default=str)
+        return _dumps(v).decode("utf-8")
     except Exception:
         return str(v)
 
 
-def save_result_csv(test_name: str, result: Dict[str, Any], filename: str | None = None) -> Path:
+def save_result_csv(test_name: str, result: Dict[str, Any], filename: str | None = None,
+                    ts: str | None = None) -> Path:
     """Salva resultado em CSV, adicionando automaticamente timestamp e duração."""
+    return save_result_csv_many(test_name, [result], filename, ts)
+
+
+def save_result_csv_many(test_name: str, results: Iterable[Dict[str, Any]], filename: str | None = None,
+                         ts: str | None = None) -> Path:
+    """
+    Salva vários resultados no mesmo CSV abrindo o arquivo uma única vez.
+    As colunas são a união (ordenada) das chaves de todos os resultados.
+    Levanta ValueError se não houver nada a salvar (nenhum resultado ou só dicts vazios).
+    `ts` permite reaproveitar um timestamp já calculado (ex: vários saves no mesmo lote).
+    """
+    results = list(results)
+    fieldnames = sorted({k for r in results for k in r})
+    if not fieldnames:
+        raise ValueError("Nenhum resultado para salvar em CSV.")
+
     _ensure_results_dir()
 
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    fname = filename or f"{test_name}-{ts}.csv"
+    # timestamp só é calculado quando o nome do arquivo depende dele
+    fname = filename or f"{test_name}-{ts or _timestamp()}.csv"
     out_path = RESULTS_DIR / fname
 
-    keys = sorted(result.keys())
     write_header = not out_path.exists()
 
-    with out_path.open("a", newline="", encoding="utf-8") as fh:
-        writer = csv.writer(fh)
+    # buffer de 64 KiB: as linhas vão para o disco em blocos, não uma write() por linha
+    with out_path.open("a", buffering=1 << 16, newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fieldnames, restval="")
         if write_header:
-            writer.writerow(keys)
-        row = [_normalize_value(result.get(k)) for k in keys]
-        writer.writerow(row)
+            writer.writeheader()
+        writer.writerows({k: _normalize_value(v) for k, v in r.items()} for r in results)
 
     return out_path
 
 
-def save_result_json(test_name: str, result: Dict[str, Any], filename: str | None = None) -> Path:
-    """Salva resultado em JSON bonito."""
+def save_result_json(test_name: str, result: Dict[str, Any], filename: str | None = None,
+                     ts: str | None = None) -> Path:
+    """Salva resultado em JSON bonito. `ts` opcional, como em save_result_csv_many."""
     _ensure_results_dir()
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    fname = filename or f"{test_name}-{ts}.json"
+    # timestamp só é calculado quando o nome do arquivo depende dele
+    fname = filename or f"{test_name}-{ts or _timestamp()}.json"
     out_path = RESULTS_DIR / fname
 
-    with out_path.open("w", encoding="utf-8") as fh:
-        json.dump(result, fh, indent=2, ensure_ascii=False, default=str)
+    with out_path.open("wb") as fh:
+        fh.write(_dumps(result, indent=True))
 
     return out_path
 
 
 def enrich_result(test_name: str, result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
-    """Adiciona metadados automáticos (timestamp e duração)."""
+    """
+    Adiciona metadados automáticos (timestamp e duração).
+    `start_time` deve vir de time.perf_counter().
+    """
     enriched = dict(result)
     enriched["test_name"] = test_name
     enriched["run_timestamp"] = datetime.now().isoformat()
-    enriched["duration_seconds"] = round(time.time() - start_time, 3)
+    enriched["duration_seconds"] = round(time.perf_counter() - start_time, 3)
     return enriched